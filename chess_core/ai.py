@@ -1,216 +1,424 @@
 """10层神经网络AI"""
 import numpy as np
 import json
+import random
 import time
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
+from numba import njit
 from .engine import ChineseChess
-import hashlib
+
+# 神经网络输入维度：90格子 + 7红方棋子计数 + 7黑方棋子计数 + 1玩家特征
+INPUT_SIZE = 105
+
+# 置换表：固定大小 2^20 个槽位，按 Zobrist哈希 & TT_MASK 寻址
+TT_SIZE = 1 << 20
+TT_MASK = TT_SIZE - 1
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+# 以黑方视角搜索时异或进置换表键（评估含玩家特征，两种视角的分值不能混用）
+TT_BLACK_PERSPECTIVE_KEY = int(np.random.SeedSequence(1).generate_state(1, dtype=np.uint64)[0])
+
+# 走法生成缓存：与置换表同样按哈希低位寻址的固定大小旁路表
+MOVEGEN_CACHE_SIZE = 1 << 15
+MOVEGEN_CACHE_MASK = MOVEGEN_CACHE_SIZE - 1
+
+# 叶节点批量评估的块大小上限（按块惰性评估，剪枝后不再评估剩余走法）
+LEAF_BATCH_SIZE = 32
+
+@njit(cache=True, fastmath=True)
+def _first_layer_kernel(board_flat: np.ndarray, player_sign: float, w1_lut: np.ndarray,
+                        w1_player: np.ndarray, b1: np.ndarray, piece_values: np.ndarray,
+                        out: np.ndarray) -> int:
+    """
+    单次遍历棋盘：累加非空格子的查找表行（格子值与棋子计数特征已折叠进表），
+    经tanh写入out；同时返回红方视角的棋子价值分
+    """
+    n = out.shape[0]
+    material = 0
+    for j in range(n):
+        out[j] = b1[j] + player_sign * w1_player[j]
+    for i in range(90):
+        piece = board_flat[i]
+        if piece != 0:
+            row = w1_lut[piece + 7, i]
+            for j in range(n):
+                out[j] += row[j]
+            if piece > 0:
+                material += piece_values[piece]
+            else:
+                material -= piece_values[-piece]
+    for j in range(n):
+        out[j] = np.tanh(out[j])
+    return material
+
+@njit(cache=True, fastmath=True)
+def _forward_kernel(x: np.ndarray, weights: Tuple, biases: Tuple,
+                    scratch_a: np.ndarray, scratch_b: np.ndarray) -> float:
+    """融合 matmul + bias + tanh 的逐层前向传播，在两块预分配缓冲区间交替读写"""
+    h = x
+    for i in range(len(weights)):
+        w = weights[i]
+        b = biases[i]
+        n_in, n_out = w.shape
+        out = scratch_a if i % 2 == 0 else scratch_b
+        for j in range(n_out):
+            out[j] = b[j]
+        for k in range(n_in):
+            hk = h[k]
+            for j in range(n_out):
+                out[j] += hk * w[k, j]
+        for j in range(n_out):
+            out[j] = np.tanh(out[j])
+        h = out
+    return h[0]
+
+@njit(cache=True)
+def _forward_batch_kernel(h: np.ndarray, weights: Tuple, biases: Tuple,
+                          scratch_a: np.ndarray, scratch_b: np.ndarray) -> np.ndarray:
+    """逐行调用_forward_kernel，保证批量与单个局面的评分逐位一致"""
+    out = np.empty(h.shape[0], dtype=np.float32)
+    for r in range(h.shape[0]):
+        out[r] = _forward_kernel(h[r], weights, biases, scratch_a, scratch_b)
+    return out
 
 class ChessAI:
     """10层神经网络中国象棋AI"""
     
-    def __init__(self, player: str, search_depth: int = 2):
-        self.player = player
+    def __init__(self, player: Optional[str] = None, search_depth: int = 2, time_limit: Optional[float] = None,
+                 neural_net: Optional[Dict[str, np.ndarray]] = None):
+        # player为None时，每次get_best_move按局面的当前走棋方搜索，同一实例可同时服务红黑双方
+        self.fixed_player = player
+        self._set_player(player or 'red')
         self.search_depth = search_depth
+        self.time_limit = time_limit  # 迭代加深的时间预算（秒），None表示不限
         
         # 棋子权重
         self.piece_weights = {1: 1000, 2: 20, 3: 20, 4: 40, 5: 90, 6: 45, 7: 10}
+        self._piece_value_lut = np.array([0] + [self.piece_weights[k] for k in range(1, 8)], dtype=np.int32)
         
-        # 10层神经网络参数
-        self.neural_net = self._init_neural_net()
-        
-        # 缓存
-        self._transposition_table: Dict[str, float] = {}
+        # 10层神经网络参数（可传入已有参数，如多进程训练时各子进程共用同一网络）
+        self.neural_net = neural_net if neural_net is not None else self._init_neural_net()
+        # 查找表、缓冲区与置换表等搜索用数据在首次评估/搜索时才分配（见_init_search_tables），
+        # 只用于向子进程传递配置的实例不占用这部分内存
+        self._tt_key = None
         self._cache_hits = 0
         self._cache_misses = 0
         
+        # 根节点同分走法的随机选择（保持对局多样性）
+        self._rng = random.Random()
+        
         # 性能统计
         self._eval_count = 0
         self._start_time = 0
         
+    def get_config(self) -> Dict[str, Any]:
+        """返回构造参数，ChessAI(**config)可在其他进程中重建同样的AI"""
+        return {
+            'player': self.fixed_player,
+            'search_depth': self.search_depth,
+            'time_limit': self.time_limit,
+            'neural_net': self.neural_net,
+        }
+    
+    def _init_search_tables(self):
+        """分配评估与搜索所需的查找表、缓冲区、置换表和历史表"""
+        # 第一层查找表及第2-9层的连续权重元组（供JIT内核使用）
+        self._w1_lut = self._build_w1_lut()
+        self._w1_player = self.neural_net['w1'][INPUT_SIZE - 1]  # 玩家特征对应的第一层权重行
+        self._weights = tuple(np.ascontiguousarray(self.neural_net[f'w{i}']) for i in range(2, 10))
+        self._biases = tuple(np.ascontiguousarray(self.neural_net[f'b{i}']) for i in range(2, 10))
+        self._hidden_buffer = np.zeros(256, dtype=np.float32)
+        self._scratch_a = np.zeros(256, dtype=np.float32)  # 第2-9层前向传播的交替缓冲区
+        self._scratch_b = np.zeros(256, dtype=np.float32)
+        self._batch_buffer = np.zeros((LEAF_BATCH_SIZE, 256), dtype=np.float32)  # 叶节点批量评估的第一层输出
+        
+        # 置换表（key, 剩余深度, 分值, 边界类型）
+        self._tt_key = np.zeros(TT_SIZE, dtype=np.uint64)
+        self._tt_depth = np.zeros(TT_SIZE, dtype=np.int8)
+        self._tt_value = np.zeros(TT_SIZE, dtype=np.float64)  # float64：神经网络分量约1e-6，float32会将其舍入抹平
+        self._tt_flag = np.zeros(TT_SIZE, dtype=np.uint8)
+        self._movegen_cache = [None] * MOVEGEN_CACHE_SIZE  # (哈希, 玩家, 走法元组)
+        
+        # 历史启发表：按(起点格, 终点格)累计产生剪枝的次数
+        self._history = np.zeros((90, 90), dtype=np.int32)
+    
+    def _set_player(self, player: str):
+        """设置当前搜索视角"""
+        self.player = player
+        self.opponent = 'black' if player == 'red' else 'red'
+        self._player_sign = 1 if player == 'red' else -1
+        self._perspective_key = 0 if player == 'red' else TT_BLACK_PERSPECTIVE_KEY
+    
     def _init_neural_net(self) -> Dict[str, np.ndarray]:
         """初始化10层神经网络参数"""
         # 网络结构: 90 -> 256 -> 128 -> 64 -> 32 -> 16 -> 8 -> 4 -> 2 -> 1
         net = {}
         
         # 输入层 (棋盘90个格子 + 7红方棋子特征 + 7黑方棋子特征 + 1玩家特征 = 105)
-        net['w1'] = np.random.randn(105, 256) * 0.05
-        net['b1'] = np.zeros(256)
+        net['w1'] = np.random.randn(INPUT_SIZE, 256).astype(np.float32) * np.float32(0.05)
+        net['b1'] = np.zeros(256, dtype=np.float32)
         
         # 隐藏层2-9
         layers = [256, 128, 64, 32, 16, 8, 4, 2, 1]
         for i in range(len(layers) - 1):
-            net[f'w{i+2}'] = np.random.randn(layers[i], layers[i+1]) * 0.05
-            net[f'b{i+2}'] = np.zeros(layers[i+1])
+            net[f'w{i+2}'] = np.random.randn(layers[i], layers[i+1]).astype(np.float32) * np.float32(0.05)
+            net[f'b{i+2}'] = np.zeros(layers[i+1], dtype=np.float32)
         
         return net
     
-    def _compute_board_hash(self, board: np.ndarray) -> str:
-        """计算棋盘哈希（用于缓存）"""
-        return hashlib.md5(board.tobytes()).hexdigest()
+    def _build_w1_lut(self) -> np.ndarray:
+        """预计算第一层查找表：lut[p+7, 格子] = p * W1[格子] + W1[棋子p的计数特征]"""
+        w1 = self.neural_net['w1']
+        lut = np.zeros((15, 90, w1.shape[1]), dtype=np.float32)
+        for p in range(1, 8):
+            lut[7 + p] = p * w1[:90] + w1[89 + p]    # 红方计数特征: w1[90..96]
+            lut[7 - p] = -p * w1[:90] + w1[96 + p]   # 黑方计数特征: w1[97..103]
+        return lut
     
-    def _encode_board(self, board: np.ndarray) -> np.ndarray:
-        """将棋盘编码为神经网络输入"""
-        # 编码策略：90格子 + 7种棋子数 + 当前玩家
-        encoded = []
-        
-        # 1. 90个格子值
-        encoded.extend(board.flatten())
-        
-        # 2. 红方棋子数量特征
-        for piece_type in range(1, 8):
-            encoded.append(np.sum(board == piece_type))
-        
-        # 3. 黑方棋子数量特征
-        for piece_type in range(1, 8):
-            encoded.append(np.sum(board == -piece_type))
-        
-        # 4. 当前玩家特征
-        encoded.append(1 if self.player == 'red' else -1)
-        
-        return np.array(encoded, dtype=np.float32)
+    def _first_layer(self, board: np.ndarray, out: np.ndarray) -> float:
+        """查表计算第一层输出并写入out，同时返回基于棋子价值的传统评估分（己方视角）"""
+        material = _first_layer_kernel(board.ravel(), float(self._player_sign), self._w1_lut, self._w1_player,
+                                       self.neural_net['b1'], self._piece_value_lut, out)
+        # 🚨 核心修复：黑方视角反转
+        return float(material * self._player_sign)
     
-    def _forward_pass(self, x: np.ndarray) -> float:
-        """9层神经网络前向传播（修正）"""
+    def _forward_pass(self, h: np.ndarray) -> float:
+        """9层神经网络前向传播（修正），输入为第一层输出"""
         try:
-            h = x
-            # 实际只有9层权重 (w1-w9)
-            for i in range(1, 10):
-                h = np.tanh(h @ self.neural_net[f'w{i}'] + self.neural_net[f'b{i}'])
-            
-            return float(h[0])
+            # 实际只有9层权重 (w1-w9)，第一层由_first_layer查表完成
+            return float(_forward_kernel(h, self._weights, self._biases, self._scratch_a, self._scratch_b))
         except Exception as e:
             print(f"神经网络前向传播错误: {e}")
             return 0.0
     
-    def evaluate_board(self, chess_game: ChineseChess) -> float:
-        """评估棋盘局面（10层神经网络）"""
-        board_hash = self._compute_board_hash(chess_game.board)
-        cache_key = f"{board_hash}_{self.player}"
-        
-        if cache_key in self._transposition_table:
+    def _forward_pass_batch(self, h: np.ndarray) -> np.ndarray:
+        """批量前向传播第2-9层：(B, 256) -> (B,)，一次调用完成整批，结果与_forward_pass一致"""
+        return _forward_batch_kernel(h, self._weights, self._biases, self._scratch_a, self._scratch_b)
+    
+    def evaluate_board(self, chess_game: ChineseChess, board_hash: Optional[int] = None) -> float:
+        """评估棋盘局面（10层神经网络），board_hash为调用方已算好的置换表键"""
+        if self._tt_key is None:
+            self._init_search_tables()
+        if board_hash is None:
+            board_hash = chess_game.board_hash ^ self._perspective_key
+        
+        entry = self._tt_probe(board_hash, 0)
+        if entry is not None and entry[1] == TT_EXACT:
             self._cache_hits += 1
-            return self._transposition_table[cache_key]
+            return entry[0]
         
         self._cache_misses += 1
         self._eval_count += 1
         
-        # 获取神经网络输入
-        encoded_board = self._encode_board(chess_game.board)
+        # 第一层查表与传统棋子评估在同一次棋盘遍历中完成（传统评估作为辅助）
+        piece_score = self._first_layer(chess_game.board, self._hidden_buffer)
         
         # 获取神经网络评分
-        neural_score = self._forward_pass(encoded_board)
-        
-        # 传统评估作为辅助
-        piece_score = self._evaluate_pieces(chess_game)
+        neural_score = self._forward_pass(self._hidden_buffer)
         
         # 综合评分（神经网络主导）
         total_score = neural_score * 0.7 + piece_score * 0.3
         
         # 缓存结果
-        self._transposition_table[cache_key] = total_score
+        self._tt_store(board_hash, 0, total_score, TT_EXACT)
         
         return total_score
     
-    def _evaluate_pieces(self, chess_game: ChineseChess) -> float:
-        """基于棋子价值的传统评估"""
-        score = 0
-        for i in range(10):
-            for j in range(9):
-                piece = chess_game.board[i, j]
-                if piece != 0:
-                    value = self.piece_weights.get(abs(piece), 0)
-                    score += value if piece > 0 else -value
-        
-        # 🚨 核心修复：黑方视角反转
-        if self.player == 'black':
-            score = -score
-        
-        return score  # ✅ 修复：正确缩进
+    def _evaluate_children(self, chess_game: ChineseChess, moves: list) -> list:
+        """批量评估走完每步后的叶节点局面，未命中缓存的局面合并为一次批量前向传播"""
+        batch = self._batch_buffer
+        
+        scores = [0.0] * len(moves)
+        pending = []  # (走法下标, 局面哈希, 棋子分)
+        for i, move in enumerate(moves):
+            undo = chess_game.apply_move(move)
+            board_hash = chess_game.board_hash ^ self._perspective_key
+            entry = self._tt_probe(board_hash, 0)
+            if entry is not None and entry[1] == TT_EXACT:
+                self._cache_hits += 1
+                scores[i] = entry[0]
+            else:
+                self._cache_misses += 1
+                piece_score = self._first_layer(chess_game.board, batch[len(pending)])
+                pending.append((i, board_hash, piece_score))
+            chess_game.undo_move(undo)
+        
+        if pending:
+            self._eval_count += len(pending)
+            neural_scores = self._forward_pass_batch(batch[:len(pending)])
+            for (i, board_hash, piece_score), neural_score in zip(pending, neural_scores):
+                total_score = float(neural_score) * 0.7 + piece_score * 0.3
+                self._tt_store(board_hash, 0, total_score, TT_EXACT)
+                scores[i] = total_score
+        
+        return scores
     
-    def get_best_move(self, chess_game: ChineseChess) -> Tuple:
-        """获取最佳走法（带性能监控）"""
-        legal_moves = chess_game.get_legal_moves(self.player)
+    def _iter_child_scores(self, chess_game: ChineseChess, moves: list):
+        """分块惰性产出子节点评分：首个走法单独评估，之后块大小倍增至LEAF_BATCH_SIZE"""
+        start, size = 0, 1
+        while start < len(moves):
+            yield from self._evaluate_children(chess_game, moves[start:start + size])
+            start += size
+            size = min(size * 2, LEAF_BATCH_SIZE)
+    
+    def get_best_move(self, chess_game: ChineseChess, player: Optional[str] = None) -> Tuple:
+        """获取最佳走法（带性能监控），player默认取构造时指定的一方，否则为当前走棋方"""
+        self._set_player(player or self.fixed_player or chess_game.current_player)
+        if self._tt_key is None:
+            self._init_search_tables()
+        legal_moves = self._get_legal_moves(chess_game, self.player)
         if not legal_moves:
             return None
         
-        # 打乱走法顺序（增加多样性）
-        import random
-        random.shuffle(legal_moves)
+        # 走法排序（提高剪枝效率）
+        self._order_moves(chess_game.board, legal_moves)
         
-        best_score = float('-inf')
-        best_move = None
+        best_moves = []
         
         self._start_time = time.time()
         
-        for move in legal_moves:
-            new_game = ChineseChess()
-            new_game.board = chess_game.board.copy()
-            new_game.current_player = chess_game.current_player
-            new_game.make_move(move)
+        # 迭代加深：上一轮的最佳走法排在最前，子树结果通过置换表复用
+        for depth in range(1, self.search_depth + 1):
+            if best_moves:
+                legal_moves.remove(best_moves[0])
+                legal_moves.insert(0, best_moves[0])
             
-            score = self._minimax(new_game, self.search_depth - 1, float('-inf'), float('inf'), False)
+            best_score = float('-inf')
+            best_moves = []
+            for move in legal_moves:
+                undo = chess_game.apply_move(move)
+                # 下界取紧邻当前最佳分的下一个float64，与之同分的走法得到精确值，
+                # 更低的走法照常剪枝（TT值为float64，不存在舍入造成的假同分）
+                alpha = float(np.nextafter(best_score, -np.inf))
+                score = self._minimax(chess_game, depth - 1, alpha, float('inf'), False)
+                chess_game.undo_move(undo)
+                
+                if score > best_score:
+                    best_score = score
+                    best_moves = [move]
+                elif score == best_score:
+                    best_moves.append(move)
             
-            if score > best_score:
-                best_score = score
-                best_move = move
+            if self.time_limit is not None and time.time() - self._start_time > self.time_limit:
+                break
         
-        # 清理过期的缓存项
-        if len(self._transposition_table) > 100000:
-            self._transposition_table.clear()
-        
-        return best_move
+        # 仅在float64评分完全相等的走法间随机选择：自对弈的多样性来源于此，
+        # 只作用于真正等价的走法，不会以更差的走法为代价
+        return self._rng.choice(best_moves)
+    
+    def _get_legal_moves(self, chess_game: ChineseChess, player: str) -> list:
+        """带缓存的走法生成，返回新列表（调用方可原地排序）"""
+        board_hash = chess_game.board_hash
+        idx = board_hash & MOVEGEN_CACHE_MASK
+        entry = self._movegen_cache[idx]
+        if entry is not None and entry[0] == board_hash and entry[1] == player:
+            return list(entry[2])
+        
+        moves = chess_game.get_legal_moves(player)
+        self._movegen_cache[idx] = (board_hash, player, tuple(moves))
+        return moves
+    
+    def _order_moves(self, board: np.ndarray, moves: list):
+        """原地排序走法：吃子按MVV-LVA优先，其余按历史启发得分"""
+        weights = self.piece_weights
+        history = self._history
+        
+        def order_key(move):
+            x1, y1, x2, y2 = move
+            victim = board[x2, y2]
+            if victim:
+                return (1, weights[abs(victim)] * 1000 - weights[abs(board[x1, y1])])
+            return (0, history[x1 * 9 + y1, x2 * 9 + y2])
+        
+        moves.sort(key=order_key, reverse=True)
+    
+    def _tt_probe(self, board_hash: int, depth: int):
+        """查询置换表，命中且深度足够时返回(分值, 边界类型)，否则返回None"""
+        idx = board_hash & TT_MASK
+        if int(self._tt_key[idx]) == board_hash and self._tt_depth[idx] >= depth:
+            return float(self._tt_value[idx]), int(self._tt_flag[idx])
+        return None
+    
+    def _tt_store(self, board_hash: int, depth: int, value: float, flag: int):
+        """写入置换表（同一局面仅在深度不低于已有条目时覆盖）"""
+        idx = board_hash & TT_MASK
+        if int(self._tt_key[idx]) == board_hash and self._tt_depth[idx] > depth:
+            return
+        self._tt_key[idx] = board_hash
+        self._tt_depth[idx] = depth
+        self._tt_value[idx] = value
+        self._tt_flag[idx] = flag
     
     def _minimax(self, chess_game: ChineseChess, depth: int, alpha: float, beta: float, maximizing_player: bool) -> float:
         """Minimax算法实现"""
-        board_hash = self._compute_board_hash(chess_game.board)
-        cache_key = f"{board_hash}_{depth}_{maximizing_player}"
-        
-        if cache_key in self._transposition_table:
-            return self._transposition_table[cache_key]
-        
+        board_hash = chess_game.board_hash ^ self._perspective_key
         if depth == 0 or chess_game.game_over:
-            return self.evaluate_board(chess_game)
+            return self.evaluate_board(chess_game, board_hash)
+        
+        entry = self._tt_probe(board_hash, depth)
+        if entry is not None:
+            value, flag = entry
+            if flag == TT_EXACT:
+                return value
+            if flag == TT_LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                return value
+        orig_alpha, orig_beta = alpha, beta
         
         if maximizing_player:
-            max_eval = float('-inf')
-            legal_moves = chess_game.get_legal_moves(self.player)
+            best_eval = float('-inf')
+            legal_moves = self._get_legal_moves(chess_game, self.player)
+            self._order_moves(chess_game.board, legal_moves)
+            # 深度为1时子节点都是叶节点，批量评估
+            child_scores = self._iter_child_scores(chess_game, legal_moves) if depth == 1 else None
             
             for move in legal_moves:
-                new_game = ChineseChess()
-                new_game.board = chess_game.board.copy()
-                new_game.current_player = chess_game.current_player
-                new_game.make_move(move)
-                
-                eval_score = self._minimax(new_game, depth - 1, alpha, beta, False)
-                max_eval = max(max_eval, eval_score)
+                if child_scores is not None:
+                    eval_score = next(child_scores)
+                else:
+                    undo = chess_game.apply_move(move)
+                    eval_score = self._minimax(chess_game, depth - 1, alpha, beta, False)
+                    chess_game.undo_move(undo)
+                best_eval = max(best_eval, eval_score)
                 alpha = max(alpha, eval_score)
                 
                 if beta <= alpha:
+                    x1, y1, x2, y2 = move
+                    self._history[x1 * 9 + y1, x2 * 9 + y2] += depth * depth
                     break  # Beta剪枝
-            
-            self._transposition_table[cache_key] = max_eval
-            return max_eval
         else:
-            min_eval = float('inf')
-            opponent = 'black' if self.player == 'red' else 'red'
-            legal_moves = chess_game.get_legal_moves(opponent)
+            best_eval = float('inf')
+            legal_moves = self._get_legal_moves(chess_game, self.opponent)
+            self._order_moves(chess_game.board, legal_moves)
+            # 深度为1时子节点都是叶节点，批量评估
+            child_scores = self._iter_child_scores(chess_game, legal_moves) if depth == 1 else None
             
             for move in legal_moves:
-                new_game = ChineseChess()
-                new_game.board = chess_game.board.copy()
-                new_game.current_player = chess_game.current_player
-                new_game.make_move(move)
-                
-                eval_score = self._minimax(new_game, depth - 1, alpha, beta, True)
-                min_eval = min(min_eval, eval_score)
+                if child_scores is not None:
+                    eval_score = next(child_scores)
+                else:
+                    undo = chess_game.apply_move(move)
+                    eval_score = self._minimax(chess_game, depth - 1, alpha, beta, True)
+                    chess_game.undo_move(undo)
+                best_eval = min(best_eval, eval_score)
                 beta = min(beta, eval_score)
                 
                 if beta <= alpha:
+                    x1, y1, x2, y2 = move
+                    self._history[x1 * 9 + y1, x2 * 9 + y2] += depth * depth
                     break  # Alpha剪枝
-            
-            self._transposition_table[cache_key] = min_eval
-            return min_eval
+        
+        # 按窗口判断边界类型后写入置换表
+        if best_eval <= orig_alpha:
+            flag = TT_UPPER
+        elif best_eval >= orig_beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self._tt_store(board_hash, depth, best_eval, flag)
+        return best_eval
     
     def get_stats(self) -> Dict[str, Any]:
         """获取性能统计"""
@@ -219,5 +427,5 @@ class ChessAI:
             'cache_misses': self._cache_misses,
             'cache_hit_rate': self._cache_hits / max(self._cache_hits + self._cache_misses, 1),
             'eval_count': self._eval_count,
-            'table_size': len(self._transposition_table)
+            'table_size': int(np.count_nonzero(self._tt_key)) if self._tt_key is not None else 0
         }
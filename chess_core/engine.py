@@ -1,6 +1,23 @@
 """中国象棋规则引擎"""
 import numpy as np
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, NamedTuple, Optional
+
+# Zobrist哈希键：每个(棋子, 行, 列)一个64位随机数，棋子值+7作为索引（索引7为空位，恒为0）
+_ZOBRIST_STATE = np.random.SeedSequence(0).generate_state(15 * 90 + 1, dtype=np.uint64)
+ZOBRIST_PIECE_KEYS = _ZOBRIST_STATE[:15 * 90].reshape(15, 10, 9)
+ZOBRIST_PIECE_KEYS[7] = 0
+ZOBRIST_SIDE_KEY = int(_ZOBRIST_STATE[15 * 90])  # 黑方走棋时异或该键
+# 转为Python int嵌套列表，避免热路径上的NumPy标量开销
+_ZOBRIST = ZOBRIST_PIECE_KEYS.tolist()
+
+class UndoInfo(NamedTuple):
+    """撤销走法所需的信息"""
+    move: Tuple
+    captured_piece: int
+    prev_player: str
+    prev_game_over: bool
+    prev_winner: Optional[str]
+    prev_hash: int
 
 class ChineseChess:
     """中国象棋规则引擎"""
@@ -11,7 +28,7 @@ class ChineseChess:
         self.game_over = False
         self.winner = None
         self.move_history = []
-        self._board_hash = None
+        self.board_hash = self._compute_hash()
         
     def _init_board(self):
         """初始化棋盘"""
@@ -44,6 +61,16 @@ class ChineseChess:
         self.game_over = False
         self.winner = None
         self.move_history = []
+        self.board_hash = self._compute_hash()
+    
+    def _compute_hash(self) -> int:
+        """从头计算当前局面的Zobrist哈希"""
+        h = 0
+        for i, j in zip(*np.nonzero(self.board)):
+            h ^= _ZOBRIST[int(self.board[i, j]) + 7][i][j]
+        if self.current_player == 'black':
+            h ^= ZOBRIST_SIDE_KEY
+        return h
     
     def get_board_state(self) -> np.ndarray:
         """获取当前棋盘状态"""
@@ -217,25 +244,58 @@ class ChineseChess:
             return False
         
         # 执行移动
-        captured_piece = self.board[x2, y2]
-        self.board[x2, y2] = self.board[x1, y1]
-        self.board[x1, y1] = 0
+        undo = self.apply_move(move)
         
         # 记录走法
         self.move_history.append({
-            'player': self.current_player,
+            'player': undo.prev_player,
             'move': move,
-            'captured': captured_piece
+            'captured': undo.captured_piece
         })
         
-        # 切换玩家
-        self.current_player = 'black' if self.current_player == 'red' else 'red'
-        
         # 检查游戏是否结束
         self._check_game_over()
         
         return True
     
+    def apply_move(self, move: Tuple) -> UndoInfo:
+        """执行走法但不校验合法性、不记录历史（供搜索使用），返回撤销信息"""
+        x1, y1, x2, y2 = move
+        piece = int(self.board[x1, y1])
+        captured_piece = int(self.board[x2, y2])
+        undo = UndoInfo(move, captured_piece, self.current_player,
+                        self.game_over, self.winner, self.board_hash)
+        
+        self.board[x2, y2] = piece
+        self.board[x1, y1] = 0
+        
+        # 增量更新Zobrist哈希
+        self.board_hash ^= (_ZOBRIST[piece + 7][x1][y1] ^ _ZOBRIST[captured_piece + 7][x2][y2] ^
+                            _ZOBRIST[piece + 7][x2][y2] ^ ZOBRIST_SIDE_KEY)
+        
+        # 切换玩家
+        self.current_player = 'black' if self.current_player == 'red' else 'red'
+        
+        # 吃掉将/帅即分胜负
+        if captured_piece == 1:
+            self.game_over = True
+            self.winner = 'black'
+        elif captured_piece == -1:
+            self.game_over = True
+            self.winner = 'red'
+        
+        return undo
+    
+    def undo_move(self, undo: UndoInfo):
+        """撤销apply_move执行的走法"""
+        x1, y1, x2, y2 = undo.move
+        self.board[x1, y1] = self.board[x2, y2]
+        self.board[x2, y2] = undo.captured_piece
+        self.current_player = undo.prev_player
+        self.game_over = undo.prev_game_over
+        self.winner = undo.prev_winner
+        self.board_hash = undo.prev_hash
+    
     def _check_game_over(self):
         """检查游戏是否结束"""
         red_has_general = np.any(self.board == 1)
@@ -46,8 +46,8 @@ def benchmark():
         
         move_count = 0
         while not game.game_over and move_count < 100:
-            current_ai = ai if game.current_player == 'red' else ChessAI('black', search_depth=2)
-            move = current_ai.get_best_move(game)
+            # 同一AI实例按当前走棋方为双方搜索
+            move = ai.get_best_move(game, game.current_player)
             
             if move:
                 game.make_move(move)
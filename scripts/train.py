@@ -277,10 +277,12 @@
 import sys
 import os
 import json
+import base64
 import time
 import argparse
+import multiprocessing as mp
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 
 # 添加路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -288,6 +290,60 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from chess_core import ChineseChess, ChessAI
 from chess_core.utils import get_cpu_usage, get_memory_usage, format_time
 
+def play_game(ai1: ChessAI, ai2: ChessAI, game_id: int) -> Tuple[list, float]:
+    """单局对弈，返回(所有棋盘状态, 用时)"""
+    game_start = time.time()
+    game = ChineseChess()
+    game_states = []
+    
+    for move_count in range(1, 200):  # 最大200步防止死循环
+        current_ai = ai1 if game.current_player == 'red' else ai2
+        
+        # 记录当前棋盘状态（10x9 int8矩阵的原始字节，写盘时再编码）
+        board_state = game.board.tobytes()
+        
+        # AI选择走法
+        move = current_ai.get_best_move(game)
+        if not move:
+            break
+        
+        # 执行走法
+        game.make_move(move)
+        
+        # 记录完整数据（包含元信息）
+        game_states.append({
+            'game_id': game_id,
+            'move_number': move_count,
+            'player': game.current_player,
+            'board_state': board_state,  # 90字节，按行展开的10x9矩阵，值为实际权重值
+            'move': move,
+            'piece_type': int(abs(game.board[move[2], move[3]])),
+            'captured_piece': int(abs(game.board[move[2], move[3]])) if game.board[move[2], move[3]] != 0 else 0
+        })
+        
+        if game.game_over:
+            break
+    
+    # 添加结果
+    result = game.winner if game.winner else 'draw'
+    for state in game_states:
+        state['result'] = result
+    
+    return game_states, time.time() - game_start
+
+# 多进程训练时每个子进程内的AI（由进程池初始化函数构建）
+_worker_ais = None
+
+def _init_worker(ai_configs: list):
+    """进程池初始化：在子进程内按完整构造参数（ChessAI.get_config）构建AI，避免每局传输"""
+    global _worker_ais
+    ais = [ChessAI(**config) for config in ai_configs]
+    _worker_ais = (ais[0], ais[-1])
+
+def _play_game_in_worker(game_id: int) -> Tuple[list, float]:
+    """子进程中运行单局对弈"""
+    return play_game(_worker_ais[0], _worker_ais[1], game_id)
+
 class SelfPlayTrainer:
     """自我对弈训练系统（持续运行版）"""
     
@@ -301,8 +357,8 @@ class SelfPlayTrainer:
         print(f"训练数据将保存到: {self.output_dir}")
         
         # 批次管理
-        self.current_batch = {}  # 当前批次数据 {train_id: game_states}
         self.batch_start_game = 1  # 当前批次起始局数
+        self._batch_file = None  # 当前批次文件（JSON Lines，逐局追加写入）
         
         # 统计信息（只保留当前批次）
         self.batch_stats = {
@@ -320,12 +376,13 @@ class SelfPlayTrainer:
             'start_time': time.time(),
         }
         
-    def run_self_play(self, max_games: int = 1000000):
+    def run_self_play(self, max_games: int = 1000000, workers: int = 1):
         """
         运行自我对弈训练
         
         Args:
             max_games: 最大对局数，默认1000000
+            workers: 并行对弈的进程数，1表示在当前进程中顺序运行
         """
         print("="*80)
         print("中国象棋AI自我对弈训练系统（批次保存版）")
@@ -333,19 +390,25 @@ class SelfPlayTrainer:
         print(f"AI搜索深度: {self.ai1.search_depth}")
         print(f"总训练局数: {max_games:,}")
         print(f"每批次局数: 10,000")
+        print(f"并行进程数: {workers}")
         print(f"保存目录: {self.output_dir}")
         print("="*80)
         
+        game_ids = range(1, max_games + 1)
+        pool = None
+        if workers > 1:
+            # 子进程内构建AI（同一实例服务双方时只构建一个），结果按局号顺序返回以保持批次文件的局数范围
+            ais = [self.ai1] if self.ai1 is self.ai2 else [self.ai1, self.ai2]
+            ai_configs = [ai.get_config() for ai in ais]
+            pool = mp.Pool(workers, initializer=_init_worker, initargs=(ai_configs,))
+            games = pool.imap(_play_game_in_worker, game_ids, chunksize=4)
+        else:
+            games = (play_game(self.ai1, self.ai2, game_id) for game_id in game_ids)
+        
         try:
-            for game_id in range(1, max_games + 1):
-                # 运行单局对弈
-                game_start = time.time()
-                game_states = self._play_single_game(game_id)
-                game_duration = time.time() - game_start
-                
-                # 记录到当前批次
-                batch_key = f'train_{game_id}'
-                self.current_batch[batch_key] = game_states
+            for game_id, (game_states, game_duration) in enumerate(games, 1):
+                # 追加写入当前批次文件
+                self._write_game(game_id, game_states)
                 
                 # 更新统计
                 self.batch_stats['total_games'] += 1
@@ -365,7 +428,6 @@ class SelfPlayTrainer:
                     self._print_batch_progress(game_id, game_duration)
                     
                     # 重置批次数据
-                    self.current_batch = {}
                     self.batch_start_game = game_id + 1
                     self.batch_stats = {
                         'total_games': 0,
@@ -375,95 +437,70 @@ class SelfPlayTrainer:
                         'total_time': 0,
                     }
                 
-                # 休眠释放CPU
-                time.sleep(0.005)  # 5ms
-                
         except KeyboardInterrupt:
             print("\n\n检测到 Ctrl+C，正在保存数据...")
-            # 保存剩余批次
-            if self.current_batch:
-                self._save_batch(game_id)
         
         except Exception as e:
             print(f"\n\n发生错误: {e}")
-            if self.current_batch:
-                self._save_batch(game_id)
         
         finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            
+            # 保存剩余批次
+            if self._batch_file is not None:
+                self._save_batch(game_id)
             self.global_stats['end_time'] = time.time()
             self.global_stats['total_time'] = self.global_stats['end_time'] - self.global_stats['start_time']
             self._print_final_stats()
         
-    def _play_single_game(self, game_id: int) -> list:
-        """单局对弈，返回所有棋盘状态"""
-        game = ChineseChess()
-        game_states = []
-        
-        for move_count in range(1, 200):  # 最大200步防止死循环
-            current_ai = self.ai1 if game.current_player == 'red' else self.ai2
-            
-            # 记录当前棋盘状态（10x9矩阵）
-            board_state = game.get_board_state().tolist()
-            
-            # AI选择走法
-            move = current_ai.get_best_move(game)
-            if not move:
-                break
-            
-            # 执行走法
-            game.make_move(move)
-            
-            # 记录完整数据（包含元信息）
-            game_states.append({
-                'game_id': game_id,
-                'move_number': move_count,
-                'player': game.current_player,
-                'board_state': board_state,  # 10x9矩阵，其中x为实际权重值
-                'move': move,
-                'piece_type': int(abs(game.board[move[2], move[3]])),
-                'captured_piece': int(abs(game.board[move[2], move[3]])) if game.board[move[2], move[3]] != 0 else 0
-            })
-            
-            if game.game_over:
-                break
-        
-        # 添加结果
-        result = game.winner if game.winner else 'draw'
-        for state in game_states:
-            state['result'] = result
-        
-        return game_states
+    def _partial_batch_path(self) -> str:
+        """当前批次写入中的文件路径"""
+        return os.path.join(self.output_dir, f'train_{self.batch_start_game}_partial.jsonl')
+    
+    def _open_batch_file(self):
+        """打开当前批次文件；上次运行被强制终止遗留的同名文件先改名保留，不覆盖"""
+        path = self._partial_batch_path()
+        if os.path.exists(path):
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            kept = os.path.join(self.output_dir, f'train_{self.batch_start_game}_interrupted_{timestamp}.jsonl')
+            os.replace(path, kept)
+            print(f"⚠ 发现上次未完成的批次文件，已改名保留: {kept}")
+        self._batch_file = open(path, 'w', buffering=1 << 20, encoding='utf-8')
+    
+    def _write_game(self, game_id: int, game_states: list):
+        """将单局的棋盘状态追加写入当前批次文件（每行一局），不在内存中保留"""
+        if self._batch_file is None:
+            self._open_batch_file()
+        
+        # 只提取board_state矩阵（这才是实际的棋盘权重矩阵），base64编码
+        # 解码: np.frombuffer(base64.b64decode(s), dtype=np.int8).reshape(10, 9)
+        board_states = [base64.b64encode(state['board_state']).decode('ascii') for state in game_states]
+        self._batch_file.write(json.dumps({f'train_{game_id}': board_states}, ensure_ascii=False))
+        self._batch_file.write('\n')
+        
+        # 每100局刷新一次，中断时最多丢失最近的缓冲数据
+        if game_id % 100 == 0:
+            self._batch_file.flush()
     
     def _save_batch(self, end_game_id: int):
-        """保存当前批次数据"""
+        """结束当前批次：关闭文件并按局数范围重命名"""
         start_id = self.batch_start_game
         end_id = end_game_id
-        batch_size = len(self.current_batch)
-        
-        # 构建文件名
-        filename = os.path.join(self.output_dir, f'train_{start_id}_to_{end_id}.json')
+        batch_size = self.batch_stats['total_games']
         
-        # 准备数据：只提取board_state矩阵，按局组织
-        batch_data = {}
-        for train_key, game_states in self.current_batch.items():
-            # 提取每步的board_state（这才是实际的棋盘权重矩阵）
-            board_states = [state['board_state'] for state in game_states]
-            batch_data[train_key] = board_states
+        self._batch_file.close()
+        self._batch_file = None
         
-        # 写入JSON文件
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(batch_data, f, ensure_ascii=False, indent=2)
+        # 构建文件名
+        filename = os.path.join(self.output_dir, f'train_{start_id}_to_{end_id}.jsonl')
+        os.replace(self._partial_batch_path(), filename)
         
         # 更新批次计数
         self.global_stats['total_batches'] += 1
         
-        # 清理AI缓存防止内存泄漏
-        if len(self.ai1._transposition_table) > 50000:
-            self.ai1._transposition_table.clear()
-        if len(self.ai2._transposition_table) > 50000:
-            self.ai2._transposition_table.clear()
-        
-        print(f"\n✓ 已保存批次: {filename} ({batch_size}局, {len(batch_data)}个矩阵)\n")
+        print(f"\n✓ 已保存批次: {filename} ({batch_size}局)\n")
     
     def _print_batch_progress(self, current_games: int, last_game_time: float):
         """打印批次进度"""
@@ -510,6 +547,12 @@ def main():
         help="最大对局数，默认1,000,000",
         default=1000000
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="并行对弈的进程数，默认CPU核数",
+        default=os.cpu_count() or 1
+    )
     
     args = parser.parse_args()
     
@@ -517,16 +560,17 @@ def main():
     print("中国象棋AI后台训练程序")
     print("="*80)
     print(f"训练局数: {args.max_games:,}")
+    print(f"并行进程数: {args.workers}")
     
-    # 创建AI实例（深度1平衡速度和质量）
-    ai1 = ChessAI('red', search_depth=1)
-    ai2 = ChessAI('black', search_depth=1)
+    # 创建AI实例（深度1平衡速度和质量），红黑双方共用同一评估器与缓存；
+    # 多进程时主进程只向子进程传递其构造参数，置换表等搜索数据仅在子进程中分配
+    ai = ChessAI(search_depth=1)
     
     # 创建训练器
-    trainer = SelfPlayTrainer(ai1, ai2)
+    trainer = SelfPlayTrainer(ai, ai)
     
     # 开始训练
-    trainer.run_self_play(max_games=args.max_games)
+    trainer.run_self_play(max_games=args.max_games, workers=args.workers)
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
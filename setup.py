@@ -25,6 +25,7 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "numpy>=1.21.0",
+        "numba>=0.56.0",
         "pygame>=2.1.0",
         "psutil>=5.8.0",
     ],